@@ -0,0 +1,54 @@
+from numba.pycc import CC
+
+from walk_core import search_nd, seed_state
+
+# Compiles the search ahead of time into the walk_ext module (next to this file) so runs
+# can import it instead of waiting for Numba to compile it, build it with:
+#   python build_walk_ext.py
+cc = CC('walk_ext')
+
+
+@cc.export('search2d', 'b1(u1[:, ::1], i2[:, ::1], i2[:, ::1], i8, i8)')
+def search2d(occ, walk, offsets, seed, limit):
+    """
+    Searches for a 2D walk starting from walk[:, 0], see search_nd() in walk_core.py
+
+    :param occ: 1 where a point is blocked (border, obstacle or already visited) else 0
+    :type occ: np.ndarray
+    :param walk: (2, n) grid indices of the walk, walk[:, 0] is the start
+    :type walk: np.ndarray
+    :param offsets: (4, 2) directions able to move to
+    :type offsets: np.ndarray
+    :param seed: seed for the random direction choices
+    :type seed: int
+    :param limit: most steps to take before giving up (0 for no limit)
+    :type limit: int
+    :return: True if the walk could be finished
+    :rtype: bool
+    """
+    return search_nd(occ, walk, offsets, walk.shape[1], seed_state(seed), limit)
+
+
+@cc.export('search3d', 'b1(u1[:, :, ::1], i2[:, ::1], i2[:, ::1], i8, i8)')
+def search3d(occ, walk, offsets, seed, limit):
+    """
+    Searches for a 3D walk starting from walk[:, 0], see search_nd() in walk_core.py
+
+    :param occ: 1 where a point is blocked (border, obstacle or already visited) else 0
+    :type occ: np.ndarray
+    :param walk: (3, n) grid indices of the walk, walk[:, 0] is the start
+    :type walk: np.ndarray
+    :param offsets: (6, 3) directions able to move to
+    :type offsets: np.ndarray
+    :param seed: seed for the random direction choices
+    :type seed: int
+    :param limit: most steps to take before giving up (0 for no limit)
+    :type limit: int
+    :return: True if the walk could be finished
+    :rtype: bool
+    """
+    return search_nd(occ, walk, offsets, walk.shape[1], seed_state(seed), limit)
+
+
+if __name__ == '__main__':
+    cc.compile()
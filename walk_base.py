@@ -0,0 +1,391 @@
+import abc
+import dbm
+import hashlib
+import importlib.util
+import os
+import pickle
+import random
+import shelve
+
+import numpy as np
+from collections import OrderedDict
+
+try:
+    # Searches compiled ahead of time by build_walk_ext.py, these don't need Numba (or its import) at all
+    from walk_ext import search2d, search3d
+    AOT_SEARCH = {2: search2d, 3: search3d}
+except ImportError:
+    AOT_SEARCH = {}
+
+
+def first_walk(occ, start, offsets, n, seeds, limit):
+    """
+    Finds a walk with the search of the first seed that finishes within limit steps,
+    if none of them do then the search with the first seed keeps going until it's done
+
+    Uses the searches from walk_ext when it has been built, else the @njit ones in walk_core.py.
+
+    :param occ: 1 where a point is blocked (border, obstacle or already visited) else 0
+    :type occ: np.ndarray
+    :param start: (D,) grid indices the walk starts from
+    :type start: np.ndarray
+    :param offsets: (2 * D, D) directions able to move to
+    :type offsets: np.ndarray
+    :param n: number of steps
+    :type n: int
+    :param seeds: seed for each search
+    :type seeds: np.ndarray
+    :param limit: most steps each search takes before giving up
+    :type limit: int
+    :return: (D, n) grid indices of the walk, None if there is no walk
+    :rtype: np.ndarray
+    """
+    search = AOT_SEARCH.get(offsets.shape[1])
+    walk = np.zeros((offsets.shape[1], n), dtype=np.int16)
+    walk[:, 0] = start
+    if search is None:
+        # Only imported when it's used since importing Numba takes longer than most pure Python searches
+        from walk_core import find_walk, try_many
+        # Runs the searches in parallel and takes the first one that finished its walk
+        walks, ok = try_many(occ, start, offsets, n, seeds, limit)
+        if ok.any():
+            return walks[np.argmax(ok)]
+        if find_walk(occ, walk, offsets, seeds[0]):
+            return walk
+        return None
+    # Ahead of time compiled code can't run in parallel so tries the seeds in order,
+    # the first one to finish is the same walk try_many() would have picked
+    for seed in seeds:
+        if search(occ.copy(), walk, offsets, seed, limit):
+            return walk
+    if search(occ, walk, offsets, seeds[0], 0):
+        return walk
+    return None
+
+
+class RandomWalkBase(abc.ABC):
+    """
+    Everything about making a walk that is the same in 2D and 3D, the walk has D dimensions
+    where D is the number of columns in OFFSETS
+
+    Subclasses set NUM_OBSTACLES and OFFSETS and where the edges are with set_edges().
+    """
+    # Number of obstacles put in the way of the walk
+    NUM_OBSTACLES = 0
+    # Where walks that have already been made are saved
+    CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'random_walk')
+    # Part of the cache key, has to be increased whenever a change to the search gives different walks
+    # for the same seed so walks made by the old code aren't loaded
+    CACHE_VERSION = 2
+    # Number of searches jit_walk() runs at once and how many steps each takes before giving up
+    TRIALS = 8
+    TRIAL_LIMIT = 100000
+    # Most dead ends avoid_walk() remembers before forgetting the oldest ones
+    DEAD_LIMIT = 100000
+    # Each of the directions able to move to, (2 * D, D)
+    OFFSETS = np.zeros((0, 0), dtype=np.int16)
+
+    def __init__(self, size, use_cache=True, use_numba=None):
+        dim = self.OFFSETS.shape[1]
+        self.num_steps = size
+        # By default the compiled search is only used when walk_ext has been built, compiling it with Numba
+        # takes seconds while the pure Python search takes milliseconds for walks of a few hundred steps
+        if use_numba is None:
+            use_numba = bool(AOT_SEARCH)
+        # Falls back to the pure Python search if it was asked for but Numba isn't installed
+        self.use_numba = use_numba and bool(AOT_SEARCH or importlib.util.find_spec('numba'))
+        self.obs_points = np.zeros((0, dim), dtype=np.int16)
+        self.obstacles = np.zeros((0, 4 ** dim, dim), dtype=np.int16)
+        self.max_distance = 0
+        self.occ = np.zeros((0,) * dim, dtype=np.uint8)
+        # Shuffles the possible steps, seeded from NumPy in rand_avoid()
+        self.rng = random.Random()
+        # Flat view of occ, how far each direction moves in it and a random number for each point (made by avoid_walk())
+        self.flat = memoryview(self.occ.reshape(-1))
+        self.strides = []
+        self.zobrist = []
+        self.dead = OrderedDict()
+        # Reuses the walk from an earlier run with the same seed if there is one
+        if use_cache:
+            self.walk = self.cached_walk(self.num_steps)
+        else:
+            self.walk = self.rand_avoid(self.num_steps)
+
+    @abc.abstractmethod
+    def set_edges(self, size):
+        """
+        Sets max_distance, how far from the origin (along each axis) the edges are
+
+        :param size: number of steps to be taken
+        :type size: int
+        """
+
+    def cached_walk(self, size):
+        """
+        Loads the walk from the cache on disk if it was made before from the same random state, else makes and saves it
+
+        :param size: number of steps to be taken
+        :type size: int
+        :return: random walk that avoids itself, objects, and edges
+        :rtype: np.ndarray
+        """
+        dim = self.OFFSETS.shape[1]
+        path = os.path.join(self.CACHE_DIR, 'walks%dd' % dim)
+        key = self.cache_key(size)
+        try:
+            os.makedirs(self.CACHE_DIR, exist_ok=True)
+            with shelve.open(path) as cache:
+                saved = cache.get(key)
+        except (OSError, *dbm.error, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # The cache can't be used (e.g. home isn't writable, the file is corrupt or the saved walk
+            # was pickled by a different NumPy) so makes the walk without it
+            return self.rand_avoid(size)
+        if saved is not None:
+            walk, self.obstacles, state = saved
+            self.obs_points = self.obstacles.reshape(-1, dim)
+            self.set_edges(size)
+            # Leaves NumPy's random state as if the walk had just been made
+            np.random.set_state(state)
+            return walk
+        walk = self.rand_avoid(size)
+        # Only walks that were found are saved
+        if walk is not False:
+            try:
+                with shelve.open(path) as cache:
+                    cache[key] = (walk, self.obstacles, np.random.get_state())
+            except (OSError, *dbm.error):
+                # Not being able to save it only means the walk gets made again next time
+                pass
+        return walk
+
+    def cache_key(self, size):
+        """
+        Makes the cache key from everything the walk depends on
+        (version of the code, number of steps and obstacles, which search is used and how, and NumPy's random state)
+
+        :param size: number of steps to be taken
+        :type size: int
+        :return: hex digest identifying the walk
+        :rtype: str
+        """
+        state = np.random.get_state()
+        # The compiled search's walk also depends on how many searches it tries and for how long
+        search = (self.TRIALS, self.TRIAL_LIMIT) if self.use_numba else None
+        key = hashlib.sha1(repr((self.CACHE_VERSION, size, self.NUM_OBSTACLES, search, state[2:])).encode())
+        key.update(state[1].tobytes())
+        return key.hexdigest()
+
+    def rand_avoid(self, size):
+        """
+        makes a random walk that avoids itself, objects and edges
+
+        :param size: number of steps to be taken
+        :type size: int
+        :return: (D, n) random walk that avoids itself, objects, and edges (False if there is none)
+        :rtype: np.ndarray
+        """
+        # Creates empty (zeros) array of appropriate size
+        steps = np.zeros((self.OFFSETS.shape[1], size), dtype=np.int16)
+        # Determines where the edges are by finding the max distance from origin
+        self.set_edges(size)
+        # Generates random obstacles before walk is determined
+        self.generate_obstacles(self.NUM_OBSTACLES)
+        # Marks the border, obstacles and origin as points the walk can't move to
+        self.make_grid()
+        # Uses the compiled search if it can
+        if self.use_numba:
+            return self.jit_walk(size)
+        # Seed comes from NumPy so seeding np.random still gives the same walk
+        self.rng.seed(np.random.randint(2 ** 31 - 1))
+        # Finds random walk
+        steps = self.avoid_walk(steps)
+        return steps
+
+    def make_grid(self):
+        """
+        Creates the occupancy grid, a square or cube covering +/-max where 1 means the walk can't go to that point
+
+        Points are stored shifted by max so (-max, -max, ...) is at index (0, 0, ...).
+        """
+        max = self.max_distance
+        dim = self.OFFSETS.shape[1]
+        d = 2 * max + 1
+        self.occ = np.zeros((d,) * dim, dtype=np.uint8)
+        # Blocks the border (the walk has to stay strictly inside +/-max)
+        for axis in range(dim):
+            self.occ.swapaxes(0, axis)[[0, -1]] = 1
+        # Blocks the obstacles
+        obs = self.obs_points + max
+        self.occ[tuple(obs.T)] = 1
+        # Flat view of the grid (shares its memory) so a point is one index and checking it is one lookup
+        self.flat = memoryview(self.occ.reshape(-1))
+        # How far each of the OFFSETS moves in the flat grid
+        self.strides = (self.OFFSETS * d ** np.arange(dim)[::-1]).sum(axis=1).tolist()
+        # The walk starts at the origin
+        self.occ[(max,) * dim] = 1
+
+    def jit_walk(self, size):
+        """
+        makes the random walk with the compiled search (walk_ext if it has been built, else walk_core.py)
+
+        :param size: number of steps to be taken
+        :type size: int
+        :return: random walk that avoids itself, objects, and edges (False if there is none)
+        :rtype: np.ndarray
+        """
+        max = self.max_distance
+        # Walk is stored as grid indices so the origin is at (max, max, ...)
+        start = np.full(self.OFFSETS.shape[1], max, dtype=np.int16)
+        # Seeds come from NumPy so seeding np.random still gives the same walk
+        seeds = np.random.randint(2 ** 31 - 1, size=self.TRIALS)
+        # Takes the first search that finishes its walk, if none do in time keeps going with the first seed
+        walk = first_walk(self.occ, start, self.OFFSETS, size, seeds, self.TRIAL_LIMIT)
+        if walk is None:
+            return False
+        # Shifts the grid indices back so the walk starts at the origin
+        return walk - max
+
+    def avoid_walk(self, steps):
+        """
+        Depth first search that takes a np.zeros((D, n)) and finds walk that avoids objects, edges, and itself
+
+        Uses a stack of the choices left at each step instead of recursion so long walks
+        don't hit Python's recursion limit. Dead ends are remembered by where the walk is
+        and which points it has visited, so another path reaching the same state skips it.
+
+        :param steps: (D, n) coordinates set to zero for appropriate len
+        :type steps: np.ndarray
+        :return: (D, n) coordinates of the points the walk has travelled to, False if there is no walk
+        :rtype: np.ndarray
+        """
+        max = self.max_distance
+        n = len(steps[0])
+        # Checks if all steps have been done
+        if n == 1:
+            return steps
+        # Random number for each point that the visited points are hashed with, only made here (and once
+        # per grid size, it's the same for every grid of that size) since the compiled search doesn't use it
+        if len(self.zobrist) != self.occ.size:
+            numbers = random.Random(self.occ.shape[0])
+            self.zobrist = [numbers.getrandbits(64) for _ in range(self.occ.size)]
+        # Looked up once here instead of on every step
+        flat = self.flat
+        zobrist = self.zobrist
+        dead = self.dead
+        possible_steps = self.possible_steps
+        limit = self.DEAD_LIMIT
+        # Flat grid index of each point the walk has travelled to
+        path = [int(np.ravel_multi_index(tuple(steps[:, 0] + max), self.occ.shape))]
+        # Hash of the visited points (XOR of each point's random number so it can be updated one step at a time)
+        key = zobrist[path[0]]
+        # Each entry is a step and the possible steps (pre-randomized) not tried yet for it
+        stack = [(1, iter(possible_steps(path[0])))]
+        while stack:
+            i, choices = stack[-1]
+            point = next(choices, None)
+            # If none of possible steps can be added (all dead ends) then this is a dead end
+            if point is None:
+                stack.pop()
+                # Goes back a step so that point is free again for the other choices
+                if stack:
+                    point = path.pop()
+                    # Remembers that ending on this point with these points visited is a dead end
+                    dead[(point, key)] = None
+                    if len(dead) > limit:
+                        dead.popitem(last=False)
+                    flat[point] = 0
+                    key ^= zobrist[point]
+                continue
+            # Takes the step and marks the point as visited so later steps can't land on it
+            path.append(point)
+            flat[point] = 1
+            key ^= zobrist[point]
+            # Checks if all steps have been done
+            if i + 1 == n:
+                # Turns the flat indices back into points
+                steps[:] = np.array(np.unravel_index(path, self.occ.shape)) - max
+                return steps
+            # Skips the step if a different path already found this to be a dead end
+            if (point, key) in dead:
+                dead.move_to_end((point, key))
+                path.pop()
+                flat[point] = 0
+                key ^= zobrist[point]
+                continue
+            # Moves on to the next step
+            stack.append((i + 1, iter(possible_steps(point))))
+        # Every path was a dead end
+        return False
+
+    def possible_steps(self, point):
+        """
+        Finds the possible steps that the walk could take on its next step
+
+        :param point: flat grid index of the current position of the walk
+        :type point: int
+        :return: flat grid indices of the points avoid_walk() can move to
+        :rtype: list
+        """
+        flat = self.flat
+        # Checks which options are allowed (doesn't hit itself, edges, or obstacles)
+        # The border is blocked in the grid so the walk never gets next to the edge of the grid
+        possible_choices = [point + s for s in self.strides if not flat[point + s]]
+        # Where we randomize the direction we go since avoid_walk() will iterate through non-randomly
+        self.rng.shuffle(possible_choices)
+        # Tries the steps with the fewest free neighbours first (Warnsdorff's rule) so the walk
+        # doesn't leave behind pockets it can't get back into; the sort keeps ties in random order
+        possible_choices.sort(key=self.free_neighbours)
+        return possible_choices
+
+    def free_neighbours(self, point):
+        """
+        Counts how many of the points next to a point the walk could still move to
+
+        :param point: flat grid index of the point
+        :type point: int
+        :return: number of free neighbouring points
+        :rtype: int
+        """
+        flat = self.flat
+        return [flat[point + s] for s in self.strides].count(0)
+
+    def generate_obstacles(self, n):
+        """
+        Creates objects (points) that are to be avoided
+
+        :param n: number of objects
+        :type n: int
+        """
+        dim = self.OFFSETS.shape[1]
+        # Has to find place for each object that does not block the origin
+        origins = np.array([self.random_obstacle_placement() for i in range(n)], dtype=np.int16).reshape(-1, dim)
+        # Points of a 4x4 (x4) object starting at the origin
+        side = np.arange(4, dtype=np.int16)
+        block = np.stack(np.meshgrid(*[side] * dim, indexing='ij'), axis=-1).reshape(-1, dim)
+        # Moves a copy of the block to each origin, one (4 ** D, D) array of points per obstacle
+        self.obstacles = origins[:, None, :] + block
+        # All the points occupied by obstacles
+        self.obs_points = self.obstacles.reshape(-1, dim)
+
+    def random_obstacle_placement(self):
+        """
+        Finds a place to put an obstacle that doesn't block the origin
+
+        Draws a batch of places at once and keeps drawing batches until one of them doesn't block the origin.
+
+        :raises ValueError: if the border is too close to the origin for any place to not block it
+        :return: a place to put an object that doesn't block the origin
+        :rtype: np.ndarray
+        """
+        max = self.max_distance
+        # Every place blocks the origin unless the obstacle can start more than 4 away from it
+        if max <= 4:
+            raise ValueError('size is too small to place an obstacle that does not block the origin')
+        while True:
+            # Finds places to put obstacle
+            origins = np.random.randint(-max, max - 3, size=(32, self.OFFSETS.shape[1]))
+            # Checks to see which placements would block origin
+            blocks = ((origins >= -4) & (origins <= 0)).all(axis=1)
+            # Returns the first position that doesn't
+            if not blocks.all():
+                return origins[~blocks][0]
@@ -0,0 +1,268 @@
+import numpy as np
+from numba import njit, prange
+
+# The search works the same in any number of dimensions, it is given the directions it can
+# move in as a (2 * D, D) offsets array (the OFFSETS of RandomWalk or RandomWalk3D)
+
+
+@njit(cache=True)
+def strides(d, offsets):
+    """
+    Finds how far each of the offsets moves in the flattened grid with sides of length d
+
+    :param d: length of a side of the grid
+    :type d: int
+    :param offsets: (2 * D, D) directions able to move to
+    :type offsets: np.ndarray
+    :return: change in flat index for each direction
+    :rtype: np.ndarray
+    """
+    out = np.zeros(offsets.shape[0], dtype=np.int64)
+    for j in range(offsets.shape[0]):
+        for k in range(offsets.shape[1]):
+            out[j] = out[j] * d + offsets[j, k]
+    return out
+
+
+@njit(cache=True)
+def seed_state(seed):
+    """
+    Turns a seed into the state of the random generator used by the search
+
+    Each search keeps its own state instead of using np.random so searches running
+    in parallel don't share (or race on) one generator.
+
+    :param seed: seed for the random direction choices
+    :type seed: int
+    :return: (1,) generator state, never 0
+    :rtype: np.ndarray
+    """
+    # splitmix64 so nearby seeds give unrelated states
+    z = np.uint64(seed) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z = z ^ (z >> np.uint64(31))
+    state = np.empty(1, dtype=np.uint64)
+    state[0] = z if z != np.uint64(0) else np.uint64(1)
+    return state
+
+
+@njit(cache=True)
+def rand_below(state, n):
+    """
+    Random integer from 0 up to (not including) n using a xorshift64* generator
+
+    :param state: (1,) generator state, updated in place
+    :type state: np.ndarray
+    :param n: upper bound
+    :type n: int
+    :return: random integer in [0, n)
+    :rtype: int
+    """
+    x = state[0]
+    x ^= x >> np.uint64(12)
+    x ^= x << np.uint64(25)
+    x ^= x >> np.uint64(27)
+    state[0] = x
+    return np.int64((x * np.uint64(0x2545F4914F6CDD1D)) >> np.uint64(33)) % n
+
+
+@njit(cache=True, boundscheck=False)
+def possible_steps(flat, step, cur, out, free, state):
+    """
+    Finds the possible steps that the walk could take on its next step (in random order)
+
+    Points are flat indices into the grid. The border of the grid is always blocked
+    so the neighbours of a free point never fall outside it and need no bounds check.
+
+    :param flat: flattened occupancy grid, 1 where a point is blocked (border, obstacle or already visited) else 0
+    :type flat: np.ndarray
+    :param step: change in flat index for each direction
+    :type step: np.ndarray
+    :param cur: flat index of the current position of the walk
+    :type cur: int
+    :param out: array the possible steps are written to, one slot per direction
+    :type out: np.ndarray
+    :param free: scratch array for the free neighbours of each possible step, one slot per direction
+    :type free: np.ndarray
+    :param state: random generator state
+    :type state: np.ndarray
+    :return: number of possible steps written to out
+    :rtype: int
+    """
+    k = 0
+    # Checks which options are allowed (doesn't hit itself, edges, or obstacles)
+    for j in range(len(step)):
+        p = cur + step[j]
+        if flat[p] == 0:
+            out[k] = p
+            k += 1
+    # Randomizes the order of the possible steps (Fisher-Yates shuffle)
+    for j in range(k - 1, 0, -1):
+        r = rand_below(state, j + 1)
+        tmp = out[j]
+        out[j] = out[r]
+        out[r] = tmp
+    # Tries the steps with the fewest free neighbours first (Warnsdorff's rule),
+    # insertion sort is stable so ties keep their random order
+    for j in range(k):
+        free[j] = free_neighbours(flat, step, out[j])
+    for j in range(1, k):
+        m = j
+        while m > 0 and free[m - 1] > free[m]:
+            tmp = free[m]
+            free[m] = free[m - 1]
+            free[m - 1] = tmp
+            tmp = out[m]
+            out[m] = out[m - 1]
+            out[m - 1] = tmp
+            m -= 1
+    return k
+
+
+@njit(cache=True, boundscheck=False)
+def free_neighbours(flat, step, p):
+    """
+    Counts how many of the points next to a point the walk could still move to
+
+    :param flat: flattened occupancy grid, 1 where a point is blocked (border, obstacle or already visited) else 0
+    :type flat: np.ndarray
+    :param step: change in flat index for each direction
+    :type step: np.ndarray
+    :param p: flat index of the point
+    :type p: int
+    :return: number of free neighbouring points
+    :rtype: int
+    """
+    free = 0
+    for j in range(len(step)):
+        if flat[p + step[j]] == 0:
+            free += 1
+    return free
+
+
+@njit(cache=True, boundscheck=False)
+def search_nd(occ, walk, offsets, n, state, limit):
+    """
+    Depth first search that fills in the walk from step 1 onwards without landing on an occupied point
+
+    Points are grid indices (shifted by the max distance so they start at 0) and
+    occ is updated in place as steps are taken and undone. The choices left at each
+    step are kept in arrays instead of recursing. Inside the search each point is a
+    single flat index into occ, so a move is one addition and a check is one lookup.
+
+    :param occ: 1 where a point is blocked (border, obstacle or already visited) else 0, border must be blocked
+    :type occ: np.ndarray
+    :param walk: (D, n) grid indices of the walk, walk[:, 0] is the start
+    :type walk: np.ndarray
+    :param offsets: (2 * D, D) directions able to move to
+    :type offsets: np.ndarray
+    :param n: number of steps
+    :type n: int
+    :param state: random generator state
+    :type state: np.ndarray
+    :param limit: most steps to take before giving up (0 for no limit)
+    :type limit: int
+    :return: True if the walk could be finished
+    :rtype: bool
+    """
+    # Checks if all steps have been done
+    if n == 1:
+        return True
+    d = occ.shape[0]
+    dims = offsets.shape[1]
+    flat = occ.reshape(-1)
+    step = strides(d, offsets)
+    # Flat index of each point of the walk
+    path = np.zeros(n, dtype=np.int64)
+    for k in range(dims):
+        path[0] = path[0] * d + walk[k, 0]
+    # Possible steps at each step and how many of them there are / have been tried
+    choices = np.empty((n, len(step)), dtype=np.int64)
+    count = np.zeros(n, dtype=np.int32)
+    tried = np.zeros(n, dtype=np.int32)
+    # Free neighbours of each possible step, reused by every call to possible_steps()
+    free = np.empty(len(step), dtype=np.int32)
+    i = 1
+    count[i] = possible_steps(flat, step, path[0], choices[i], free, state)
+    taken = 0
+    while i > 0:
+        # If none of possible steps can be added (all dead ends) then go back a step
+        if tried[i] == count[i]:
+            i -= 1
+            # That point is free again for the other choices
+            if i > 0:
+                flat[path[i]] = 0
+            continue
+        # Gives up once the search has taken too many steps
+        taken += 1
+        if limit > 0 and taken > limit:
+            return False
+        j = tried[i]
+        tried[i] += 1
+        # Takes the step and marks the point as visited
+        path[i] = choices[i, j]
+        flat[path[i]] = 1
+        # Checks if all steps have been done
+        if i + 1 == n:
+            # Turns the flat indices back into grid indices, last axis first
+            for m in range(1, n):
+                p = path[m]
+                for k in range(dims - 1, -1, -1):
+                    walk[k, m] = p % d
+                    p //= d
+            return True
+        # Moves on to the next step
+        i += 1
+        tried[i] = 0
+        count[i] = possible_steps(flat, step, path[i - 1], choices[i], free, state)
+    # Every path was a dead end
+    return False
+
+
+@njit(cache=True)
+def find_walk(occ, walk, offsets, seed):
+    """
+    Searches for a walk starting from walk[:, 0] with the random choices seeded by seed
+
+    :param occ: 1 where a point is blocked (border, obstacle or already visited) else 0
+    :type occ: np.ndarray
+    :param walk: (D, n) grid indices of the walk, walk[:, 0] is the start
+    :type walk: np.ndarray
+    :param offsets: (2 * D, D) directions able to move to
+    :type offsets: np.ndarray
+    :param seed: seed for the random direction choices
+    :type seed: int
+    :return: True if a walk was found
+    :rtype: bool
+    """
+    return search_nd(occ, walk, offsets, walk.shape[1], seed_state(seed), 0)
+
+
+@njit(cache=True, parallel=True)
+def try_many(occ, start, offsets, n, seeds, limit):
+    """
+    Runs one search per seed in parallel, each on its own copy of occ
+
+    :param occ: 1 where a point is blocked (border, obstacle or already visited) else 0
+    :type occ: np.ndarray
+    :param start: (D,) grid indices the walks start from
+    :type start: np.ndarray
+    :param offsets: (2 * D, D) directions able to move to
+    :type offsets: np.ndarray
+    :param n: number of steps
+    :type n: int
+    :param seeds: seed for each search
+    :type seeds: np.ndarray
+    :param limit: most steps each search takes before giving up
+    :type limit: int
+    :return: (len(seeds), D, n) walks and whether each search finished its walk
+    :rtype: tuple
+    """
+    walks = np.zeros((len(seeds), offsets.shape[1], n), dtype=np.int16)
+    ok = np.zeros(len(seeds), dtype=np.bool_)
+    for t in prange(len(seeds)):
+        walks[t, :, 0] = start
+        ok[t] = search_nd(occ.copy(), walks[t], offsets, n, seed_state(seeds[t]), limit)
+    return walks, ok
+